@@ -1,3 +1,5 @@
 from .charts import Chart
+from .export import EXPORT_FORMATS, export_frame
+from .refresh import DatasetRefresher
 
-__all__ = ["Chart"]
+__all__ = ["Chart", "DatasetRefresher", "EXPORT_FORMATS", "export_frame"]
@@ -0,0 +1,14 @@
+import pickle
+import sys
+
+from .charts import Chart
+
+
+def main(csv_file, out_file):
+    chart = Chart(csv_file)
+    with open(out_file, "wb") as f:
+        pickle.dump(chart, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -1,8 +1,17 @@
+from functools import partial
+from itertools import product
+
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
 
+from .export import export_frame
+
+
+FILTER_COLUMNS = ['order_year', 'order_month_name', 'us_region', 'channel']
+
 
 class Chart:
     def __init__(self, csv_file):
@@ -11,53 +20,197 @@ class Chart:
 
     def data_preprocessing(self):
         self.df['order_date'] = pd.to_datetime(self.df['order_date'])
+        self.build_period_totals()
+        self.build_filter_options()
+
+    def build_period_totals(self):
+        # additive per-period totals, so any period/filter combination is a small sum
+        # dropna=False keeps rows with a missing key in the totals, so the KPIs
+        # count the same rows as filter_data
+        self.period_totals = self.df.groupby([
+            self.df['order_date'].dt.year.astype('Int64').rename('order_year'),
+            'order_month_num', 'order_month_name', 'us_region', 'channel'
+        ], dropna=False).agg(
+            revenue=('revenue', 'sum'),
+            profit=('profit', 'sum'),
+            orders=('order_number', 'count'),
+            rows=('order_number', 'size')
+        ).reset_index()
+
+        months = self.df[['order_month_name', 'order_month_num']].drop_duplicates()
+        self.month_numbers = dict(
+            zip(months['order_month_name'], months['order_month_num']))
+
+    def build_filter_options(self):
+        # (column, year, month, region, channel) -> {value: row count}, with the
+        # column's own slot and any unselected filter stored as None
+        self.filter_options = {}
+
+        for column in FILTER_COLUMNS:
+            others = [other for other in FILTER_COLUMNS if other != column]
+
+            for fixed in product([False, True], repeat=len(others)):
+                keys = [other for other, is_fixed in zip(others, fixed) if is_fixed]
+                counts = self.period_totals.groupby(
+                    keys + [column], dropna=False)['rows'].sum().reset_index()
+
+                for row in zip(*(counts[col].tolist() for col in keys + [column, 'rows'])):
+                    # a missing value can't be selected, but its rows still count under 'All'
+                    if any(pd.isna(value) for value in row[:-2]):
+                        continue
+
+                    selection = dict.fromkeys(FILTER_COLUMNS)
+                    selection.update(zip(keys, row))
+                    options = self.filter_options.setdefault(
+                        (column, *selection.values()), {'All': 0})
+                    options['All'] += row[-1]
+                    if not pd.isna(row[-2]):
+                        options[row[-2]] = row[-1]
+
+        # groupby sorts month names alphabetically, put them back in calendar order
+        for key, options in self.filter_options.items():
+            if key[0] == 'order_month_name':
+                self.filter_options[key] = dict(sorted(
+                    options.items(), key=lambda item: self.month_numbers.get(item[0], 0)))
+
+    def filter_option_counts(self, column, year=None, month=None, us_region=None, channel=None):
+        selection = dict(zip(FILTER_COLUMNS, (year, month, us_region, channel)))
+        selection[column] = None
+        return self.filter_options.get((column, *selection.values()), {'All': 0})
+
+    def filter_mask(self, year=None, month=None, us_region=None, channel=None):
+        mask = np.ones(len(self.df), dtype=bool)
+
+        if year is not None:
+            mask &= (self.df["order_date"].dt.year == year).to_numpy()
+
+        if month is not None:
+            mask &= (self.df["order_month_name"] == month).to_numpy()
+
+        if us_region is not None:
+            mask &= (self.df["us_region"] == us_region).to_numpy()
+
+        if channel is not None:
+            mask &= (self.df["channel"] == channel).to_numpy()
+
+        return mask
+
+    def filter_index(self, year=None, month=None, us_region=None, channel=None):
+        return np.flatnonzero(self.filter_mask(year, month, us_region, channel))
 
     def filter_data(self, year=None, month=None, us_region=None, channel=None):
-        df = self.df.copy()
+        return self.df[self.filter_mask(year, month, us_region, channel)]
+
+    def year(self, month=None, us_region=None, channel=None):
+        return self.filter_option_counts('order_year', None, month, us_region, channel)
+
+    def month(self, year=None, us_region=None, channel=None):
+        return self.filter_option_counts('order_month_name', year, None, us_region, channel)
+
+    def us_region(self, year=None, month=None, channel=None):
+        return self.filter_option_counts('us_region', year, month, None, channel)
+
+    def channel(self, year=None, month=None, us_region=None):
+        return self.filter_option_counts('channel', year, month, us_region, None)
+
+    def period_mask(self, year=None, months=None, us_region=None, channel=None):
+        totals = self.period_totals
+        mask = np.ones(len(totals), dtype=bool)
 
         if year is not None:
-            df = df[df["order_date"].dt.year == year]
+            mask &= (totals['order_year'] == year).to_numpy(
+                dtype=bool, na_value=False)
 
-        if month is not None:
-            df = df[df["order_month_name"] == month]
+        if months is not None:
+            mask &= totals['order_month_num'].isin(months).to_numpy()
 
         if us_region is not None:
-            df = df[df["us_region"] == us_region]
+            mask &= (totals['us_region'] == us_region).to_numpy()
 
         if channel is not None:
-            df = df[df["channel"] == channel]
+            mask &= (totals['channel'] == channel).to_numpy()
 
-        return df
+        return mask
 
-    def year(self):
-        return ['All'] + self.df['order_date'].dt.year.unique().tolist()
+    def period_kpis(self, year=None, months=None, us_region=None, channel=None):
+        totals = self.period_totals
+        mask = self.period_mask(year, months, us_region, channel)
 
-    def month(self):
-        return ['All'] + self.df['order_month_name'].unique().tolist()
+        total_orders = totals['orders'].to_numpy()[mask].sum().item()
+        if total_orders == 0:
+            return None
 
-    def us_region(self):
-        return ['All'] + self.df['us_region'].unique().tolist()
+        total_revenue = totals['revenue'].to_numpy()[mask].sum().item()
+        total_profit = totals['profit'].to_numpy()[mask].sum().item()
+        profit_margin = total_profit / total_revenue * 100 if total_revenue else 0.0
+        revenue_per_order = total_revenue / total_orders
 
-    def channel(self):
-        return ['All'] + self.df['channel'].unique().tolist()
+        return total_revenue, total_profit, profit_margin, total_orders, revenue_per_order
 
     def compute_kpis(self, year=None, month=None, us_region=None, channel=None):
-        df = self.filter_data(year, month, us_region, channel)
-        total_revenue = df['revenue'].sum().item()
-        total_profit = df['profit'].sum().item()
-        profit_margin = df['profit'].sum().item() / \
-            df['revenue'].sum().item() * 100
-        total_orders = df['order_number'].count().item()
-        revenue_per_order = df['revenue'].sum().item() / \
-            df['order_number'].count().item()
+        months = None if month is None else [self.month_numbers[month]]
 
-        return total_revenue, total_profit, profit_margin, total_orders, revenue_per_order
+        current = self.period_kpis(year, months, us_region, channel) or (
+            0.0, 0.0, 0.0, 0, 0.0)
+        previous_year = None
+        previous_month = None
 
-    def monthy_revenue_rhythm(self, year, month, us_region, channel):
+        if year is not None:
+            if months is None:
+                # compare like for like, so a partial year is not measured
+                # against a full one
+                mask = self.period_mask(year, None, us_region, channel)
+                months = self.period_totals['order_month_num'].to_numpy()[
+                    mask].tolist()
+            else:
+                month_num = months[0]
+                prev_year, prev_month = (year, month_num - 1) if month_num > 1 else (
+                    year - 1, 12)
+                previous_month = self.period_kpis(
+                    prev_year, [prev_month], us_region, channel)
+
+            previous_year = self.period_kpis(
+                year - 1, months, us_region, channel)
+
+        return current, previous_year, previous_month
+
+    def aggregate_tables(self):
+        return {
+            "Revenue by State": self.state_map_df,
+            "Monthly Revenue": self.monthly_revenue_df,
+            "Monthly Profit": self.monthly_profit_df,
+            "Order Values": self.order_value_df,
+            "Top Products by Revenue": self.product_revenue_df,
+            "Top Products by Margin": self.product_margin_df,
+            "Customer Position": self.customer_position_df,
+            "Channel Performance": self.channel_df,
+            "Top Customers by Revenue": self.customer_revenue_df,
+            "Top Customers by Margin": self.customer_margin_df,
+            "Top States by Revenue": self.state_revenue_df,
+            "Bottom Customers by Revenue": partial(self.customer_revenue_df, ascending=True),
+            "Bottom Customers by Margin": partial(self.customer_margin_df, ascending=True),
+            "Bottom States by Revenue": partial(self.state_revenue_df, ascending=True),
+            "Revenue by Region": self.region_revenue_df,
+            "Profit Margin by Region": self.region_margin_df,
+        }
+
+    def export_rows(self, fmt, year=None, month=None, us_region=None, channel=None):
+        # stream straight from the base frame by position, never a filtered copy
+        rows = self.filter_index(year, month, us_region, channel)
+        return export_frame(self.df, fmt, rows)
+
+    def export_table(self, name, fmt, year=None, month=None, us_region=None, channel=None):
+        df = self.aggregate_tables()[name](year, month, us_region, channel)
+        return export_frame(df, fmt)
+
+    def monthly_revenue_df(self, year, month, us_region, channel):
         df = self.filter_data(year, month, us_region, channel)
-        df = df.groupby(['order_month_name', 'order_month_num'])[
+        return df.groupby(['order_month_name', 'order_month_num'])[
             'revenue'].sum().reset_index().sort_values('order_month_num')
 
+    def monthy_revenue_rhythm(self, year, month, us_region, channel):
+        df = self.monthly_revenue_df(year, month, us_region, channel)
+
         fig = px.line(df, x='order_month_name', y='revenue',
                       markers=True, line_shape='spline')
 
@@ -73,11 +226,14 @@ class Chart:
         )
         return fig
 
-    def profit_pulse(self, year, month, us_region, channel):
+    def monthly_profit_df(self, year, month, us_region, channel):
         df = self.filter_data(year, month, us_region, channel)
-        df = df.groupby(['order_month_name', 'order_month_num'])['profit'].sum().round(
+        return df.groupby(['order_month_name', 'order_month_num'])['profit'].sum().round(
             2).reset_index().sort_values('order_month_num', ascending=True)
 
+    def profit_pulse(self, year, month, us_region, channel):
+        df = self.monthly_profit_df(year, month, us_region, channel)
+
         fig = px.line(df, x='order_month_name',
                       y='profit', markers=True, line_shape='spline')
 
@@ -93,10 +249,13 @@ class Chart:
         )
         return fig
 
-    def order_value_spectrum(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby(
+    def order_value_df(self, year, month, us_region, channel):
+        return self.filter_data(year, month, us_region, channel).groupby(
             'order_number')['revenue'].sum().reset_index()
 
+    def order_value_spectrum(self, year, month, us_region, channel):
+        df = self.order_value_df(year, month, us_region, channel)
+
         fig = go.Figure()
 
         fig.add_trace(
@@ -158,10 +317,13 @@ class Chart:
 
         return fig
 
-    def revenue_chamption(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('product_name')[
+    def product_revenue_df(self, year, month, us_region, channel):
+        return self.filter_data(year, month, us_region, channel).groupby('product_name')[
             'revenue'].sum().reset_index().sort_values('revenue', ascending=False).head(10)
 
+    def revenue_chamption(self, year, month, us_region, channel):
+        df = self.product_revenue_df(year, month, us_region, channel)
+
         fig = go.Figure()
 
         fig.add_trace(go.Bar(
@@ -183,11 +345,14 @@ class Chart:
         fig.update_yaxes(autorange="reversed")
         return fig
 
-    def high_margin_heros(self, year, month, us_region, channel):
+    def product_margin_df(self, year, month, us_region, channel):
         df = self.filter_data(year, month, us_region, channel).groupby('product_name').agg(
             revenue=("revenue", "sum"), profit=("profit", "sum")).reset_index()
         df['profit_margin_pct'] = (df['profit'] / df['revenue'] * 100).round(2)
-        df = df.sort_values('profit_margin_pct', ascending=False).head(10)
+        return df.sort_values('profit_margin_pct', ascending=False).head(10)
+
+    def high_margin_heros(self, year, month, us_region, channel):
+        df = self.product_margin_df(year, month, us_region, channel)
 
         fig = go.Figure()
 
@@ -210,10 +375,13 @@ class Chart:
         fig.update_yaxes(autorange="reversed")
         return fig
 
-    def stratetic_profit(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('customer_name').agg(total_revenue=('revenue', 'sum'), total_profit=(
+    def customer_position_df(self, year, month, us_region, channel):
+        return self.filter_data(year, month, us_region, channel).groupby('customer_name').agg(total_revenue=('revenue', 'sum'), total_profit=(
             'profit', 'sum'), average_profit_margin=('profit_margin_pct', 'mean'), order_count=('order_number', 'nunique')).reset_index()
 
+    def stratetic_profit(self, year, month, us_region, channel):
+        df = self.customer_position_df(year, month, us_region, channel)
+
         fig = go.Figure()
         fig.add_trace(go.Scatter(
             x=df["total_revenue"],
@@ -277,9 +445,13 @@ class Chart:
         )
         return fig
 
+    def customer_revenue_df(self, year, month, us_region, channel, ascending=False):
+        return self.filter_data(year, month, us_region, channel).groupby('customer_name')[
+            'revenue'].sum().reset_index().sort_values('revenue', ascending=ascending).head(5)
+
     def top_customer_revenue(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('customer_name')[
-            'revenue'].sum().round(2).reset_index().sort_values('revenue', ascending=False).head(5)
+        df = self.customer_revenue_df(year, month, us_region, channel)
+        df = df.assign(revenue=df['revenue'].round(2))
 
         fig = go.Figure()
 
@@ -302,12 +474,15 @@ class Chart:
         fig.update_yaxes(autorange="reversed")
         return fig
 
-    def top_customer_profit_margin(self, year, month, us_region, channel):
+    def customer_margin_df(self, year, month, us_region, channel, ascending=False):
         df = self.filter_data(year, month, us_region, channel).groupby('customer_name').agg(
             total_revenue=('revenue', 'sum'), total_profit=('profit', 'sum')).reset_index()
         df['profit_margin_pct'] = (
             df['total_profit'] / df['total_revenue'] * 100).round(2)
-        df = df.sort_values('profit_margin_pct', ascending=False).head(5)
+        return df.sort_values('profit_margin_pct', ascending=ascending).head(5)
+
+    def top_customer_profit_margin(self, year, month, us_region, channel):
+        df = self.customer_margin_df(year, month, us_region, channel)
 
         fig = go.Figure()
 
@@ -330,9 +505,12 @@ class Chart:
         fig.update_yaxes(autorange="reversed")
         return fig
 
+    def state_revenue_df(self, year, month, us_region, channel, ascending=False):
+        return self.filter_data(year, month, us_region, channel).groupby('state_name')[
+            'revenue'].sum().reset_index().sort_values('revenue', ascending=ascending).head(5)
+
     def top_state_revenue(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('state_name')[
-            'revenue'].sum().reset_index().sort_values('revenue', ascending=False).head(5)
+        df = self.state_revenue_df(year, month, us_region, channel)
 
         fig = go.Figure()
 
@@ -356,8 +534,8 @@ class Chart:
         return fig
 
     def bottom_customer_revenue(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('customer_name')[
-            'revenue'].sum().reset_index().sort_values('revenue', ascending=True).head(5)
+        df = self.customer_revenue_df(
+            year, month, us_region, channel, ascending=True)
 
         fig = go.Figure()
 
@@ -380,12 +558,8 @@ class Chart:
         return fig
 
     def bottom_customer_profit_margin(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('customer_name').agg(
-            total_revenue=('revenue', 'sum'), total_profit=('profit', 'sum')).reset_index()
-
-        df['profit_margin_pct'] = (
-            df['total_profit'] / df['total_revenue'] * 100).round(2)
-        df = df.sort_values('profit_margin_pct', ascending=True).head(5)
+        df = self.customer_margin_df(
+            year, month, us_region, channel, ascending=True)
 
         fig = go.Figure()
 
@@ -408,8 +582,8 @@ class Chart:
         return fig
 
     def bottom_state_revenue(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('state_name')[
-            'revenue'].sum().reset_index().sort_values('revenue', ascending=True).head(5)
+        df = self.state_revenue_df(
+            year, month, us_region, channel, ascending=True)
 
         fig = go.Figure()
 
@@ -431,10 +605,13 @@ class Chart:
         )
         return fig
 
-    def revenue_region(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('us_region')[
+    def region_revenue_df(self, year, month, us_region, channel):
+        return self.filter_data(year, month, us_region, channel).groupby('us_region')[
             'revenue'].sum().reset_index().sort_values('us_region', ascending=True)
 
+    def revenue_region(self, year, month, us_region, channel):
+        df = self.region_revenue_df(year, month, us_region, channel)
+
         fig = go.Figure()
         fig.add_trace(go.Pie(
             labels=df["us_region"],
@@ -463,10 +640,13 @@ class Chart:
         )
         return fig
 
-    def profit_region(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby('us_region')[
+    def region_margin_df(self, year, month, us_region, channel):
+        return self.filter_data(year, month, us_region, channel).groupby('us_region')[
             'profit_margin_pct'].mean().reset_index().sort_values('us_region', ascending=True)
 
+    def profit_region(self, year, month, us_region, channel):
+        df = self.region_margin_df(year, month, us_region, channel)
+
         fig = go.Figure()
         fig.add_trace(go.Pie(
             labels=df["us_region"],
@@ -495,9 +675,12 @@ class Chart:
         )
         return fig
 
-    def us_map_reveue(self, year, month, us_region, channel):
-        df = self.filter_data(year, month, us_region, channel).groupby(
+    def state_map_df(self, year, month, us_region, channel):
+        return self.filter_data(year, month, us_region, channel).groupby(
             'state')['revenue'].sum().reset_index()
+
+    def us_map_reveue(self, year, month, us_region, channel):
+        df = self.state_map_df(year, month, us_region, channel)
         fig = px.choropleth(
             df,
             locations="state",
@@ -0,0 +1,65 @@
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+CHUNK_ROWS = 100_000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def iter_chunks(df, rows=None, chunk_size=CHUNK_ROWS):
+    # rows are positional indices into df, so only one chunk is materialised at a time
+    total = len(df) if rows is None else len(rows)
+    for start in range(0, total, chunk_size):
+        if rows is None:
+            yield df.iloc[start:start + chunk_size]
+        else:
+            yield df.iloc[rows[start:start + chunk_size]]
+
+
+def arrow_schema(df):
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+
+    # empty object columns infer as null, type them from their first real value
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            first = df[field.name].first_valid_index()
+            if first is not None:
+                value_type = pa.array(df[field.name].loc[[first]]).type
+                schema = schema.set(i, pa.field(field.name, value_type))
+
+    return schema
+
+
+def write_csv(df, sink, rows=None, chunk_size=CHUNK_ROWS):
+    sink.write(df.iloc[:0].to_csv(index=False).encode("utf-8"))
+    for chunk in iter_chunks(df, rows, chunk_size):
+        sink.write(chunk.to_csv(index=False, header=False).encode("utf-8"))
+
+
+def write_parquet(df, sink, rows=None, chunk_size=CHUNK_ROWS):
+    schema = arrow_schema(df)
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in iter_chunks(df, rows, chunk_size):
+            writer.write_table(pa.Table.from_pandas(
+                chunk, schema=schema, preserve_index=False))
+
+
+def export_frame(df, fmt, rows=None, chunk_size=CHUNK_ROWS):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    # only the pandas-side encoding is chunked; st.download_button still
+    # keeps the whole encoded file in memory to serve it
+    with tempfile.TemporaryFile() as sink:
+        if fmt == "csv":
+            write_csv(df, sink, rows, chunk_size)
+        else:
+            write_parquet(df, sink, rows, chunk_size)
+        sink.seek(0)
+        return sink.read()
@@ -0,0 +1,93 @@
+import logging
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+from .charts import Chart
+
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class DatasetRefresher:
+    def __init__(self, csv_file, interval=30):
+        self.csv_file = csv_file
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._signature = self.file_signature()
+        self._pending = self._signature
+        self._snapshot = (Chart(csv_file), 1, datetime.now())
+
+        self._thread = threading.Thread(
+            target=self.watch, name="dataset-refresher", daemon=True)
+        self._thread.start()
+
+    def file_signature(self):
+        stat = os.stat(self.csv_file)
+        return stat.st_mtime_ns, stat.st_size
+
+    def snapshot(self):
+        # callers hold on to the returned chart for the whole rerun, so a swap
+        # mid-run never changes the data underneath them
+        with self._lock:
+            return self._snapshot
+
+    def watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Dataset refresh failed, keeping the current version")
+
+    def build(self):
+        # parse and preprocess in a fresh interpreter so the rebuild does not
+        # hold the server's GIL while users rerun; only the unpickle runs here.
+        # It runs components.build directly rather than through multiprocessing,
+        # whose start methods re-import the Streamlit script as __main__
+        with tempfile.TemporaryDirectory() as tmp:
+            out_file = os.path.join(tmp, "chart.pickle")
+            result = subprocess.run(
+                [sys.executable, "-m", "components.build",
+                 os.path.abspath(self.csv_file), out_file],
+                cwd=PACKAGE_ROOT, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f"Dataset build failed: {result.stderr.strip()[-2000:]}")
+
+            with open(out_file, "rb") as f:
+                return pickle.load(f)
+
+    def refresh(self):
+        signature = self.file_signature()
+
+        # a file still being written keeps changing, wait until it settles
+        # for a full poll before building from it
+        if signature != self._pending:
+            self._pending = signature
+            return False
+
+        if signature == self._signature:
+            return False
+
+        chart = self.build()
+
+        if self.file_signature() != signature:
+            # rewritten while we were parsing it, the build may be partial
+            return False
+
+        with self._lock:
+            version = self._snapshot[1] + 1
+            self._snapshot = (chart, version, datetime.now())
+        self._signature = signature
+        return True
+
+    def stop(self):
+        self._stop.set()
@@ -1,5 +1,7 @@
+from functools import partial
+
 import streamlit as st
-from components import Chart
+from components import DatasetRefresher, EXPORT_FORMATS
 
 st.set_page_config(
     page_title="Sales Analysis | Acme",
@@ -26,24 +28,97 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+
+@st.cache_resource(on_release=lambda refresher: refresher.stop())
+def dataset_refresher():
+    return DatasetRefresher('data/sales_data.csv')
+
+
+c, data_version, data_loaded_at = dataset_refresher().snapshot()
+
 st.header("📊 Sales Analysis")
-st.caption("Acme Corporation — performance, trends, and revenue insights")
+st.caption(
+    f"Acme Corporation — performance, trends, and revenue insights · "
+    f"data v{data_version}, refreshed {data_loaded_at:%Y-%m-%d %H:%M:%S}")
+
+
+def selected(key):
+    value = st.session_state.get(key, "All")
+    return None if value == "All" else value
 
-c = Chart('data/sales_data.csv')
-with st.sidebar:
-    year = st.selectbox('Year:', options=c.year())
-    month = st.selectbox('Month:', options=c.month())
-    us_region = st.selectbox('Region: ', options=c.us_region())
-    channel = st.selectbox('Channel: ', options=c.channel())
 
-    year = None if year == "All" else year
-    month = None if month == "All" else month
-    region = None if us_region == "All" else us_region
-    channel = None if channel == "All" else channel
+def filter_select(label, key, options):
+    # options only hold values with data under the other filters, so a stale
+    # selection from the previous rerun falls back to "All"
+    if st.session_state.get(key, "All") not in options:
+        st.session_state[key] = "All"
 
+    value = st.selectbox(label, options=options, key=key,
+                         format_func=lambda v: f"{v} ({options[v]:,})")
+    return None if value == "All" else value
 
-total_revenue, total_profit, profit_margin, total_orders, revenue_per_order = c.compute_kpis(
+
+def kpi_delta(value, previous_month, previous_year, points=False):
+    comparisons = []
+    for previous, label in ((previous_month, "MoM"), (previous_year, "YoY")):
+        if previous is None:
+            continue
+        if points:
+            comparisons.append(f"{value - previous:+,.1f} pts {label}")
+        elif previous:
+            comparisons.append(
+                f"{(value - previous) / abs(previous) * 100:+,.1f}% {label}")
+
+    if not comparisons:
+        return dict(delta=None, help=None)
+    return dict(delta=comparisons[0], help=" · ".join(comparisons))
+
+
+with st.sidebar:
+    year = filter_select('Year:', 'year', c.year(
+        selected('month'), selected('us_region'), selected('channel')))
+    month = filter_select('Month:', 'month', c.month(
+        year, selected('us_region'), selected('channel')))
+    region = filter_select('Region: ', 'us_region', c.us_region(
+        year, month, selected('channel')))
+    channel = filter_select('Channel: ', 'channel', c.channel(
+        year, month, region))
+
+    with st.expander("Export"):
+        export_format = st.radio(
+            'Format:', options=list(EXPORT_FORMATS), horizontal=True)
+        export_source = st.selectbox(
+            'Data:', options=['Filtered Rows'] + list(c.aggregate_tables()))
+
+        # the file is only built when Download is clicked
+        if export_source == 'Filtered Rows':
+            export_data = partial(
+                c.export_rows, export_format, year, month, region, channel)
+        else:
+            export_data = partial(
+                c.export_table, export_source, export_format, year, month, region, channel)
+
+        st.download_button(
+            "Download",
+            data=export_data,
+            file_name=f"{export_source.lower().replace(' ', '_')}.{export_format}",
+            mime=EXPORT_FORMATS[export_format],
+            on_click="ignore",
+            width='stretch'
+        )
+
+
+current, previous_year, previous_month = c.compute_kpis(
     year, month, region, channel)
+total_revenue, total_profit, profit_margin, total_orders, revenue_per_order = current
+
+
+no_comparison = (None,) * len(current)
+kpi_deltas = [
+    kpi_delta(value, mom, yoy, points=i == 2)
+    for i, (value, mom, yoy) in enumerate(zip(
+        current, previous_month or no_comparison, previous_year or no_comparison))
+]
 
 cols = st.columns(5, gap="small")
 
@@ -51,35 +126,40 @@ with cols[0]:
     st.metric(
         "💰 Total Revenue",
         f"${total_revenue:,.0f}",
-        border=True
+        border=True,
+        **kpi_deltas[0]
     )
 
 with cols[1]:
     st.metric(
         "📈 Total Profit",
         f"${total_profit:,.0f}",
-        border=True
+        border=True,
+        **kpi_deltas[1]
     )
 
 with cols[2]:
     st.metric(
         "📊 Profit Margin",
         f"{profit_margin:,.1f}%",
-        border=True
+        border=True,
+        **kpi_deltas[2]
     )
 
 with cols[3]:
     st.metric(
         "🛒 Total Orders",
         f"{total_orders:,}",
-        border=True
+        border=True,
+        **kpi_deltas[3]
     )
 
 with cols[4]:
     st.metric(
         "🤑 Rev / Order",
         f"${revenue_per_order:,.0f}",
-        border=True
+        border=True,
+        **kpi_deltas[4]
     )
 
 
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+
+def sales_frame(periods):
+    rows = []
+    for year, month in periods:
+        for region in ("East", "West"):
+            for channel in ("Online", "Wholesale"):
+                number = len(rows)
+                rows.append({
+                    "order_date": f"{year}-{month:02d}-15",
+                    "order_month_name": pd.Timestamp(year, month, 1).month_name(),
+                    "order_month_num": month,
+                    "order_number": f"SO-{number:05d}",
+                    "revenue": 100.0,
+                    "profit": 25.0,
+                    "profit_margin_pct": 25.0,
+                    "unit_price": 10.0,
+                    "product_name": f"Product {number % 3}",
+                    "customer_name": f"Customer {number % 4}",
+                    "state_name": "New York" if region == "East" else "California",
+                    "state": "NY" if region == "East" else "CA",
+                    "us_region": region,
+                    "channel": channel,
+                })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    # all of 2023, first half of 2024
+    periods = [(2023, month) for month in range(1, 13)] + \
+        [(2024, month) for month in range(1, 7)]
+    path = tmp_path / "sales_data.csv"
+    sales_frame(periods).to_csv(path, index=False)
+    return path
@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+import pytest
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from components import Chart
+from components.export import export_frame
+
+
+def download_bytes(data):
+    # the same conversion st.download_button applies to its data argument
+    data, _ = convert_data_to_bytes_and_infer_mime(
+        data, unsupported_error=StreamlitAPIException("Invalid binary data format"))
+    return data
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_export_rows_is_downloadable(sales_csv, fmt):
+    c = Chart(sales_csv)
+    data = download_bytes(c.export_rows(fmt, year=2024, us_region="East"))
+
+    if fmt == "csv":
+        df = pd.read_csv(io.BytesIO(data))
+    else:
+        df = pd.read_parquet(io.BytesIO(data))
+
+    assert len(df) == len(c.filter_data(2024, None, "East", None))
+    assert set(df["us_region"]) == {"East"}
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_export_table_is_downloadable(sales_csv, fmt):
+    c = Chart(sales_csv)
+    data = download_bytes(c.export_table("Revenue by Region", fmt))
+
+    if fmt == "csv":
+        df = pd.read_csv(io.BytesIO(data))
+    else:
+        df = pd.read_parquet(io.BytesIO(data))
+
+    assert df["us_region"].tolist() == ["East", "West"]
+
+
+def test_export_parquet_types_null_leading_chunk():
+    df = pd.DataFrame({"note": [None, None, "late", "value"]})
+    data = export_frame(df, "parquet", chunk_size=2)
+
+    note = pd.read_parquet(io.BytesIO(data))["note"]
+    assert note.isna().tolist() == [True, True, False, False]
+    assert note.dropna().tolist() == ["late", "value"]
+
+
+def test_export_unknown_format():
+    with pytest.raises(ValueError):
+        export_frame(pd.DataFrame({"a": [1]}), "xlsx")
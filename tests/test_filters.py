@@ -0,0 +1,39 @@
+from components import Chart
+
+from conftest import sales_frame
+
+
+def test_filter_options_skip_empty_combinations(tmp_path):
+    df = sales_frame([(2023, 1), (2024, 3), (2024, 1), (2024, 2)])
+    # no 2024 West Wholesale sales at all
+    df = df[~((df["order_date"].str.startswith("2024")) & (df["us_region"] == "West") &
+              (df["channel"] == "Wholesale"))]
+    path = tmp_path / "sales_data.csv"
+    df.to_csv(path, index=False)
+
+    c = Chart(path)
+
+    assert c.channel(2024, None, "West") == {"All": 3, "Online": 3}
+    assert c.channel(2023, None, "West") == {
+        "All": 2, "Online": 1, "Wholesale": 1}
+    assert "West" not in c.us_region(2024, None, "Wholesale")
+    assert c.year(None, "West", "Wholesale") == {"All": 1, 2023: 1}
+
+    months = c.month(2024, "East")
+    assert list(months) == ["All", "January", "February", "March"]
+    assert months["All"] == sum(
+        count for value, count in months.items() if value != "All")
+    assert months["All"] == len(c.filter_data(2024, None, "East", None))
+
+
+def test_filter_options_count_missing_values_under_all(tmp_path):
+    df = sales_frame([(2023, 1), (2023, 2)])
+    df.loc[0, "us_region"] = None
+    path = tmp_path / "sales_data.csv"
+    df.to_csv(path, index=False)
+
+    c = Chart(path)
+    regions = c.us_region()
+
+    assert list(regions) == ["All", "East", "West"]
+    assert regions["All"] == len(df)
@@ -0,0 +1,49 @@
+import pytest
+
+from components import Chart
+
+from conftest import sales_frame
+
+
+def test_yoy_partial_year_compares_same_months(sales_csv):
+    c = Chart(sales_csv)
+    current, previous_year, previous_month = c.compute_kpis(2024)
+
+    # 2024 only has January-June, so 2023 is limited to the same months
+    assert previous_year == pytest.approx(current)
+    assert previous_month is None
+
+
+def test_mom_january_compares_previous_december(sales_csv):
+    c = Chart(sales_csv)
+    current, previous_year, previous_month = c.compute_kpis(
+        2024, "January", "East")
+
+    assert previous_month == pytest.approx(
+        c.period_kpis(2023, [12], "East"))
+    assert previous_year == pytest.approx(
+        c.period_kpis(2023, [1], "East"))
+
+
+def test_kpis_without_year_have_no_comparison(sales_csv):
+    c = Chart(sales_csv)
+    current, previous_year, previous_month = c.compute_kpis()
+
+    assert current[3] == 72
+    assert previous_year is None
+    assert previous_month is None
+
+
+def test_kpis_count_rows_with_missing_keys(tmp_path):
+    df = sales_frame([(2023, 1), (2023, 2)])
+    df.loc[0, "us_region"] = None
+    df.loc[1, "channel"] = None
+    df.loc[2, "order_date"] = None
+    path = tmp_path / "sales_data.csv"
+    df.to_csv(path, index=False)
+
+    c = Chart(path)
+    current, _, _ = c.compute_kpis()
+
+    assert current[3] == len(c.filter_data()) == len(df)
+    assert current[0] == pytest.approx(c.filter_data()["revenue"].sum())
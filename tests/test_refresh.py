@@ -0,0 +1,97 @@
+import os
+import sys
+import types
+
+import pytest
+
+from components import Chart, DatasetRefresher
+
+from conftest import sales_frame
+
+
+def write_extract(path, periods, mtime_ns):
+    sales_frame(periods).to_csv(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def refresher(sales_csv):
+    refresher = DatasetRefresher(sales_csv, interval=3600)
+    yield refresher
+    refresher.stop()
+
+
+def test_refresh_waits_for_stable_file(refresher, sales_csv):
+    write_extract(sales_csv, [(2025, 1)], 10**18)
+
+    assert refresher.refresh() is False
+    assert refresher.snapshot()[1] == 1
+
+    assert refresher.refresh() is True
+    chart, version, _ = refresher.snapshot()
+    assert version == 2
+    assert chart.filter_data(2025)["order_number"].count() == 4
+
+
+def test_refresh_discards_build_when_file_changes(refresher, sales_csv, monkeypatch):
+    write_extract(sales_csv, [(2025, 1)], 10**18)
+    refresher.refresh()
+
+    def build_during_write():
+        chart = Chart(sales_csv)
+        write_extract(sales_csv, [(2025, 1), (2025, 2)], 2 * 10**18)
+        return chart
+
+    monkeypatch.setattr(refresher, "build", build_during_write)
+    assert refresher.refresh() is False
+    assert refresher.snapshot()[1] == 1
+
+    # the newer file is picked up once it has settled
+    monkeypatch.undo()
+    assert refresher.refresh() is False
+    assert refresher.refresh() is True
+    chart, version, _ = refresher.snapshot()
+    assert version == 2
+    assert chart.filter_data(2025)["order_number"].count() == 8
+
+
+def test_refresh_failure_keeps_snapshot_and_retries(refresher, sales_csv, monkeypatch):
+    old_snapshot = refresher.snapshot()
+    write_extract(sales_csv, [(2025, 1)], 10**18)
+    refresher.refresh()
+
+    def broken_build():
+        raise ValueError("unparseable extract")
+
+    monkeypatch.setattr(refresher, "build", broken_build)
+    with pytest.raises(ValueError):
+        refresher.refresh()
+    assert refresher.snapshot() is old_snapshot
+
+    monkeypatch.undo()
+    assert refresher.refresh() is True
+    assert refresher.snapshot()[1] == 2
+
+
+def test_build_does_not_run_streamlit_script(refresher, tmp_path, monkeypatch):
+    # Streamlit runs the app as __main__ with a __file__ and no __spec__
+    marker = tmp_path / "script_ran"
+    script = tmp_path / "main.py"
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n")
+
+    app = types.ModuleType("__main__")
+    app.__file__ = str(script)
+    app.__spec__ = None
+    monkeypatch.setitem(sys.modules, "__main__", app)
+
+    chart = refresher.build()
+
+    assert not marker.exists()
+    assert len(chart.df) == len(refresher.snapshot()[0].df)
+
+
+def test_build_reports_failed_parse(refresher, sales_csv):
+    os.remove(sales_csv)
+
+    with pytest.raises(RuntimeError, match="Dataset build failed"):
+        refresher.build()